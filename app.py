@@ -1,20 +1,225 @@
 import streamlit as st
 import pandas as pd
-import json
-import plotly.express as px
+import orjson
+import plotly.graph_objects as go
+import plotly.io as pio
+import functools
 import gzip
+import os
+import numpy as np
+import zstandard as zstd
+from downsampling import lttb_indices
+import filtering
 
-@st.cache_data
+PARQUET_PATH = 'listings.parquet'
+ZSTD_JSON_PATH = 'normalized_listings.json.zst'
+JSON_PATH = 'normalized_listings.json.gz'
+
+# Low-cardinality string columns that are filtered on by equality
+CATEGORY_COLUMNS = ('sid', 'r', 'id')
+
+# Largest number of points drawn per ID in the time-series charts
+MAX_POINTS_PER_ID = 1500
+
+# Above this many IDs, charts aggregate instead of drawing one trace per ID
+MAX_ID_TRACES = 200
+
+# Above this many points, the Grades vs Price scatter is rasterized server-side
+MAX_SCATTER_POINTS = 50000
+
+# Sampled hover targets drawn over a rasterized scatter
+HOVER_SAMPLE_POINTS = 2000
+
+# Rows shown per page of the Filtered Data table
+PAGE_SIZE = 1000
+
+# Filter states kept per cached function; slider floats make the key space unbounded
+FILTER_CACHE_ENTRIES = 32
+
+# Bucket limit and smallest bucket size for the aggregated time-series charts
+MAX_RIBBON_BUCKETS = 500
+MIN_RIBBON_BUCKET = pd.Timedelta(minutes=1)
+
+@st.cache_resource
 def load_data(file_path):
-    with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-        data = json.load(file)
-    return pd.DataFrame(data)
+    # Shared across reruns without copying, so callers must not mutate the frame
+    # Parquet (see tools/convert.py) already stores typed timestamp and category columns
+    if file_path.endswith('.parquet'):
+        df = pd.read_parquet(file_path, engine='pyarrow')
+    else:
+        if file_path.endswith('.zst'):
+            with open(file_path, 'rb') as file, zstd.ZstdDecompressor().stream_reader(file) as reader:
+                data = orjson.loads(reader.read())
+        else:
+            with gzip.open(file_path, 'rb') as file:
+                data = orjson.loads(file.read())
+        df = pd.DataFrame(data)
+        # Convert timestamp to datetime once so the cached frame is ready to use
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    # Category codes make equality filters integer comparisons; for Parquet this and
+    # the sort below are near no-ops, since tools/convert.py already did both
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+
+    # Stable sort by timestamp so every filtered selection is already in time order
+    df.sort_values('timestamp', kind='mergesort', ignore_index=True, inplace=True)
+    return df
+
+@st.cache_resource
+def build_indexes(file_path):
+    # Section/row position indexes (see filtering.py); shared, read-only
+    return filtering.build_indexes(load_data(file_path))
 
-# Load the data
-df = load_data('normalized_listings.json.gz')
+@st.cache_data
+def filter_choices(file_path):
+    # Sorted section and row options for the sidebar selectboxes
+    df = load_data(file_path)
+    return list(df['sid'].cat.categories), list(df['r'].cat.categories)
 
-# Convert timestamp to datetime
-df['timestamp'] = pd.to_datetime(df['timestamp'])
+@st.cache_resource
+def sort_by_price(file_path):
+    # Sorted prices and their row positions (see filtering.py); shared, read-only
+    return filtering.sort_by_price(load_data(file_path))
+
+@st.cache_data
+def price_bounds(file_path):
+    # Lowest and highest price (see filtering.py)
+    p_sorted, _ = sort_by_price(file_path)
+    return filtering.price_bounds(p_sorted)
+
+def downsample_per_id(df, y, n_out=MAX_POINTS_PER_ID):
+    # Expects df sorted by timestamp (load_data guarantees it); IDs with few points are passed through untouched
+    if df.empty or df['id'].value_counts().max() <= n_out:
+        return df
+
+    parts = []
+    for _, group in df.groupby('id', observed=True, sort=False):
+        # astype on the Series also handles tz-aware timestamps
+        x_values = group['timestamp'].astype('int64').to_numpy(dtype=float)
+        keep = lttb_indices(x_values, group[y].to_numpy(dtype=float), n_out)
+        parts.append(group.iloc[keep])
+    return pd.concat(parts)
+
+def quantile_ribbon(df, y, y_label, title):
+    # Median line with a P5-P95 band per timestamp bucket, sized so the span fits MAX_RIBBON_BUCKETS
+    span = df['timestamp'].max() - df['timestamp'].min()
+    bucket = max(MIN_RIBBON_BUCKET, (span / MAX_RIBBON_BUCKETS).ceil('min'))
+    quantiles = df.groupby(pd.Grouper(key='timestamp', freq=bucket))[y].quantile([0.05, 0.5, 0.95])
+    quantiles = quantiles.unstack().dropna()
+
+    fig = go.Figure([
+        go.Scattergl(x=quantiles.index, y=quantiles[0.95], mode='lines', line={'width': 0}, name='P95'),
+        go.Scattergl(x=quantiles.index, y=quantiles[0.05], mode='lines', line={'width': 0}, fill='tonexty', name='P5'),
+        go.Scattergl(x=quantiles.index, y=quantiles[0.5], mode='lines', name='Median'),
+    ])
+    fig.update_layout(title=title, xaxis_title='Timestamp', yaxis_title=y_label)
+    return fig
+
+def hover_template(x_label, y_label, name='%{fullData.name}'):
+    # Explicit hover text over customdata = (section, row, ...), so Plotly doesn't introspect the data
+    return f'Sec %{{customdata[0]}}, Row %{{customdata[1]}}<br>{x_label}: %{{x}}<br>{y_label}: %{{y}}<extra>{name}</extra>'
+
+def figure_by_id(df, x, y, mode, x_label, y_label, title):
+    # One WebGL trace per ID, built straight from the grouped NumPy arrays;
+    # only section and row ride along as hover data
+    hovertemplate = hover_template(x_label, y_label)
+    columns = list(dict.fromkeys([x, y, 'id', 'sid', 'r']))
+    traces = [
+        go.Scattergl(x=group[x].to_numpy(), y=group[y].to_numpy(), mode=mode, name=str(listing_id),
+                     customdata=group[['sid', 'r']].to_numpy(), hovertemplate=hovertemplate)
+        for listing_id, group in df[columns].groupby('id', sort=False, observed=True)
+    ]
+    layout = {
+        'title': title,
+        'xaxis': {'title': x_label},
+        'yaxis': {'title': y_label},
+        'legend': {'title': {'text': 'id'}},
+    }
+    return go.Figure(data=traces, layout=layout)
+
+def rasterized_scatter(df, x, y, x_label, y_label, title):
+    # Datashader image of a dense scatter, placed on Plotly axes so ranges and titles still show.
+    # Imported here because datashader pulls in numba/dask/xarray and is rarely needed
+    import datashader as ds
+    import datashader.transfer_functions as tf
+
+    x_range = (float(df[x].min()), float(df[x].max()))
+    y_range = (float(df[y].min()), float(df[y].max()))
+    canvas = ds.Canvas(plot_width=800, plot_height=500, x_range=x_range, y_range=y_range)
+    image = tf.shade(canvas.points(df[[x, y]], x, y), how='eq_hist').to_pil()
+
+    layout = {
+        'title': title,
+        'xaxis': {'title': x_label, 'range': x_range, 'showgrid': False},
+        'yaxis': {'title': y_label, 'range': y_range, 'showgrid': False},
+    }
+    fig = go.Figure(layout=layout)
+    fig.add_layout_image(
+        source=image, xref='x', yref='y', x=x_range[0], y=y_range[1],
+        sizex=x_range[1] - x_range[0], sizey=y_range[1] - y_range[0],
+        sizing='stretch', layer='below',
+    )
+
+    # Invisible sampled points on top of the image so hovering still shows listing details
+    hover_points = df.sample(n=min(len(df), HOVER_SAMPLE_POINTS), random_state=0)
+    fig.add_trace(go.Scattergl(
+        x=hover_points[x].to_numpy(), y=hover_points[y].to_numpy(), mode='markers',
+        marker={'opacity': 0}, showlegend=False,
+        customdata=hover_points[['sid', 'r', 'id']].to_numpy(),
+        hovertemplate=hover_template(x_label, y_label, name='%{customdata[2]}'),
+    ))
+    return fig
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def filter_positions(file_path, filter_key):
+    # Row positions matching filter_key (see filtering.py), cached per filter state
+    p_sorted, price_order = sort_by_price(file_path)
+    return filtering.filter_positions(load_data(file_path), build_indexes(file_path), p_sorted, price_order, filter_key)
+
+def filtered_data(file_path, filter_key):
+    # The cached frame narrowed down to filter_key
+    return filtering.filtered_data(load_data(file_path), filter_key, price_bounds(file_path),
+                                   functools.partial(filter_positions, file_path))
+
+@st.cache_data(max_entries=2)
+def filtered_csv(file_path, filter_key):
+    # CSV bytes for the Show Raw Data download; an entry can be the whole dataset as text, so keep only a couple
+    return filtered_data(file_path, filter_key).to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def grades_vs_price_figure(file_path, filter_key):
+    # Figures are cached as JSON per filter state, so unrelated widgets don't rebuild them
+    filtered_df = filtered_data(file_path, filter_key)
+    dense = len(filtered_df) > MAX_SCATTER_POINTS
+    if dense and filtered_df['grade'].nunique() > 1 and filtered_df['p'].nunique() > 1:
+        fig = rasterized_scatter(filtered_df, 'grade', 'p', 'Grade', 'Price', 'Grades vs Price')
+    elif filtered_df['id'].nunique() <= MAX_ID_TRACES:
+        fig = figure_by_id(filtered_df, 'grade', 'p', 'markers', 'Grade', 'Price', 'Grades vs Price')
+    else:
+        fig = go.Figure(
+            go.Histogram2d(x=filtered_df['grade'].to_numpy(), y=filtered_df['p'].to_numpy(), nbinsx=50, nbinsy=50),
+            layout={'title': 'Grades vs Price', 'xaxis': {'title': 'Grade'}, 'yaxis': {'title': 'Price'}},
+        )
+    return fig.to_json()
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def time_series_figure(file_path, filter_key, y, y_label, title):
+    # Same JSON caching as above; None when there aren't enough timestamps to draw a change over time
+    filtered_df = filtered_data(file_path, filter_key)
+    if filtered_df['timestamp'].nunique() <= 1:
+        return None
+
+    if filtered_df['id'].nunique() <= MAX_ID_TRACES:
+        fig = figure_by_id(downsample_per_id(filtered_df, y), 'timestamp', y, 'lines+markers',
+                           'Timestamp', y_label, f'{title} by ID')
+    else:
+        fig = quantile_ribbon(filtered_df, y, y_label, f'{title} (Median, P5-P95)')
+    return fig.to_json()
+
+# Load the data, preferring the copies generated by tools/convert.py when present
+data_path = next((path for path in (PARQUET_PATH, ZSTD_JSON_PATH) if os.path.exists(path)), JSON_PATH)
+df = load_data(data_path)
 
 # Streamlit app layout
 st.title('Citi Field Ticket Listings Analysis')
@@ -32,105 +237,110 @@ Use the filters on the left to narrow down your search by section, row, price ra
 st.sidebar.header('Filter Options')
 
 # Optional filter by section
-sections = sorted(df['sid'].unique())
+sections, rows = filter_choices(data_path)
 selected_section = st.sidebar.selectbox('Select Section (Optional)', ['All'] + sections, index=sections.index('112') if '112' in sections else 0)
 
 # Optional filter by seat row
-rows = sorted(df['r'].unique())
 selected_row = st.sidebar.selectbox('Select Row (Optional)', ['All'] + rows, index=0)
 
 # Optional filter by ID
 filter_id = st.sidebar.text_input('Filter by ID (Optional)', '')
 
 # Filter by price
+lowest_price, _ = price_bounds(data_path)
 min_price, max_price = st.sidebar.slider(
     'Select Price Range',
-    float(df['p'].min()), 1600.0,  # Set default max price to 1600
-    (float(df['p'].min()), 1600.0)  # Default range
+    lowest_price, 1600.0,  # Set default max price to 1600
+    (lowest_price, 1600.0)  # Default range
 )
 
-# Apply filters
-filtered_df = df.copy()
-
-if selected_section != 'All':
-    filtered_df = filtered_df[filtered_df['sid'] == selected_section]
-
-if selected_row != 'All':
-    filtered_df = filtered_df[filtered_df['r'] == selected_row]
-
-if filter_id:
-    filtered_df = filtered_df[filtered_df['id'].str.contains(filter_id, case=False, na=False)]
-
-filtered_df = filtered_df[(filtered_df['p'] >= min_price) & (filtered_df['p'] <= max_price)]
+# Apply filters; everything downstream is keyed by this tuple
+filter_key = (selected_section, selected_row, filter_id, min_price, max_price)
+filtered_df = filtered_data(data_path, filter_key)
 
 # Summary
 st.sidebar.header('Summary Options')
 
+# Count the occurrences of prices; np.unique returns them already sorted by price
+prices, counts = np.unique(filtered_df['p'].dropna().to_numpy(), return_counts=True)
+
+# Derive the summary from the distinct prices instead of rescanning the column
+if prices.size:
+    min_price_seen, max_price_seen = prices[0], prices[-1]
+    mean_price = np.dot(prices, counts) / counts.sum()
+else:
+    min_price_seen = max_price_seen = mean_price = float('nan')
+
 st.subheader('Data Summary')
 st.write(f"Number of records: {len(filtered_df)}")
-st.write(f"Average Price: ${filtered_df['p'].mean():.2f}")
-st.write(f"Maximum Price: ${filtered_df['p'].max():.2f}")
-st.write(f"Minimum Price: ${filtered_df['p'].min():.2f}")
+st.write(f"Average Price: ${mean_price:.2f}")
+st.write(f"Maximum Price: ${max_price_seen:.2f}")
+st.write(f"Minimum Price: ${min_price_seen:.2f}")
 
-# Display filtered data
+# Display filtered data one page at a time so each rerun ships a bounded table
 st.subheader('Filtered Data')
-st.dataframe(filtered_df)
+page_count = max(1, -(-len(filtered_df) // PAGE_SIZE))
+page = st.number_input(f'Page (of {page_count})', min_value=1, max_value=page_count, value=1, step=1)
+page_start = (page - 1) * PAGE_SIZE
+st.dataframe(filtered_df.iloc[page_start:page_start + PAGE_SIZE])
 
 # Visualization
 st.sidebar.header('Visualization Options')
 
-# Sort the filtered data once
-sorted_filtered_df = filtered_df.sort_values(by='timestamp')
+# Heavy charts are only built once requested; keyed widgets keep their state across reruns
+show_scatter = st.sidebar.checkbox('Show Grades vs Price', value=False, key='show_scatter')
+show_price_changes = st.sidebar.checkbox('Show Price Changes Over Time', value=False, key='show_price_changes')
+show_grade_changes = st.sidebar.checkbox('Show Grade Over Time', value=False, key='show_grade_changes')
 
 # Price Distribution Chart
 st.subheader('Price Distribution')
 st.markdown('This chart shows the distribution of ticket prices, helping you quickly spot the most common price points.')
 
-# Count the occurrences of prices and reset the index
-price_distribution = filtered_df['p'].value_counts().reset_index()
-price_distribution.columns = ['Price', 'Count']
-price_distribution = price_distribution.sort_values('Price')
+price_distribution = pd.Series(counts, index=pd.Index(prices, name='Price'), name='Count')
 
 # Plot the bar chart
-st.bar_chart(price_distribution.set_index('Price')['Count'])
+st.bar_chart(price_distribution)
 
 # Scatter Plot for Grades vs Price using Plotly
 st.subheader('Grades vs Price')
 st.markdown('This scatter plot visualizes the relationship between the seat grade and price, helping you evaluate price points based on seat quality.')
 
-fig = px.scatter(filtered_df, x='grade', y='p', color='id', 
-                 labels={'grade': 'Grade', 'p': 'Price'},
-                 title='Grades vs Price')
-st.plotly_chart(fig)
+if show_scatter:
+    st.plotly_chart(pio.from_json(grades_vs_price_figure(data_path, filter_key)))
+else:
+    st.write("Enable 'Show Grades vs Price' in the sidebar to draw this chart.")
 
 # Chart for Price Changes Over Time using Plotly
 st.subheader('Price Changes Over Time')
 st.markdown('This line chart tracks how ticket prices have changed over time, allowing you to analyze trends in pricing as the event date approaches.')
 
-if len(sorted_filtered_df['timestamp'].unique()) > 1:
-    fig = px.line(sorted_filtered_df, x='timestamp', y='p', color='id', markers=True,
-                  labels={'timestamp': 'Timestamp', 'p': 'Price'},
-                  title='Price Changes Over Time by ID')
-    st.plotly_chart(fig)
+if show_price_changes:
+    fig_json = time_series_figure(data_path, filter_key, 'p', 'Price', 'Price Changes Over Time')
+    if fig_json is not None:
+        st.plotly_chart(pio.from_json(fig_json))
+    else:
+        st.write("Not enough data to show price changes over time.")
 else:
-    st.write("Not enough data to show price changes over time.")
+    st.write("Enable 'Show Price Changes Over Time' in the sidebar to draw this chart.")
 
 # Chart for Grade Over Time using Plotly
 st.subheader('Grade Over Time')
 st.markdown('This chart tracks changes in seat grades over time, giving insight into the availability and quality of tickets as the game date nears.')
 
-if len(sorted_filtered_df['timestamp'].unique()) > 1:
-    fig = px.line(sorted_filtered_df, x='timestamp', y='grade', color='id', markers=True,
-                  labels={'timestamp': 'Timestamp', 'grade': 'Grade'},
-                  title='Grade Over Time by ID')
-    st.plotly_chart(fig)
+if show_grade_changes:
+    fig_json = time_series_figure(data_path, filter_key, 'grade', 'Grade', 'Grade Over Time')
+    if fig_json is not None:
+        st.plotly_chart(pio.from_json(fig_json))
+    else:
+        st.write("Not enough data to show grade changes over time.")
 else:
-    st.write("Not enough data to show grade changes over time.")
+    st.write("Enable 'Show Grade Over Time' in the sidebar to draw this chart.")
 
-# Show raw data if needed
+# Offer the raw data as a download instead of rendering every row
 if st.checkbox('Show Raw Data'):
     st.subheader('Raw Data')
-    st.write(filtered_df)
+    st.download_button('Download Filtered Data (CSV)', filtered_csv(data_path, filter_key),
+                       file_name='filtered_listings.csv', mime='text/csv')
 
 # Footer note
 st.markdown("""
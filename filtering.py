@@ -0,0 +1,64 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+def build_indexes(df):
+    # Row positions for every section and row, so equality filters become lookups
+    return {column: df.groupby(column, observed=True).indices for column in ('sid', 'r')}
+
+def sort_by_price(df):
+    # Prices in ascending order plus the row position of each, for range lookups
+    prices = df['p'].to_numpy()
+    price_order = np.argsort(prices, kind='stable')
+    return prices[price_order], price_order
+
+def price_bounds(p_sorted):
+    # Lowest and highest price as plain floats; NaN prices sort last, making the upper bound NaN
+    if not p_sorted.size:
+        return float('nan'), float('nan')
+    return float(p_sorted[0]), float(p_sorted[-1])
+
+def filter_positions(df, indexes, p_sorted, price_order, filter_key):
+    # Row positions matching (section, row, ID substring, min price, max price), in row order
+    selected_section, selected_row, filter_id, min_price, max_price = filter_key
+
+    # Start from the precomputed section/row positions, which are small and already sorted
+    candidates = None
+    for column, selected in (('sid', selected_section), ('r', selected_row)):
+        if selected != 'All':
+            selected_positions = indexes[column].get(selected, np.empty(0, dtype=np.intp))
+            if candidates is None:
+                candidates = selected_positions
+            else:
+                candidates = np.intersect1d(candidates, selected_positions, assume_unique=True)
+
+    if candidates is None:
+        # No section/row pick: binary search the presorted prices and flag that slice in row order
+        lo = np.searchsorted(p_sorted, min_price, side='left')
+        hi = np.searchsorted(p_sorted, max_price, side='right')
+        in_range = np.zeros(len(df), dtype=bool)
+        in_range[price_order[lo:hi]] = True
+        positions = np.flatnonzero(in_range)
+    else:
+        # Only the candidates' prices need checking against the bounds
+        candidate_prices = df['p'].to_numpy()[candidates]
+        positions = candidates[(candidate_prices >= min_price) & (candidate_prices <= max_price)]
+
+    if filter_id:
+        # Match against the distinct IDs only (in Arrow), then keep rows by category code
+        id_categories = pa.array(df['id'].cat.categories, type=pa.string())
+        id_matches = pc.match_substring(id_categories, filter_id, ignore_case=True)
+        matching_codes = np.flatnonzero(id_matches.to_numpy(zero_copy_only=False))
+        positions = positions[np.isin(df['id'].cat.codes.to_numpy()[positions], matching_codes)]
+    return positions
+
+def filtered_data(df, filter_key, bounds, positions_for):
+    # df narrowed down to filter_key; positions_for(filter_key) is only called when something filters
+    selected_section, selected_row, filter_id, min_price, max_price = filter_key
+    lowest_price, highest_price = bounds
+
+    # Nothing narrowed down: use the cached frame itself
+    no_filters = selected_section == 'All' and selected_row == 'All' and not filter_id
+    if no_filters and min_price <= lowest_price and max_price >= highest_price:
+        return df
+    return df.iloc[positions_for(filter_key)]
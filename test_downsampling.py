@@ -0,0 +1,25 @@
+import numpy as np
+
+from downsampling import lttb_indices
+
+
+def test_keeps_endpoints_and_returns_n_out_points():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 10)
+    selected = lttb_indices(x, y, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_passes_short_input_through():
+    x = np.arange(10, dtype=float)
+    np.testing.assert_array_equal(lttb_indices(x, x, 50), np.arange(10))
+
+
+def test_keeps_spike():
+    x = np.arange(200, dtype=float)
+    y = np.zeros(200)
+    y[123] = 5.0
+    assert 123 in lttb_indices(x, y, 20)
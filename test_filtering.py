@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+import filtering
+
+ALL_PRICES = (0.0, 1e9)
+
+
+def make_listings():
+    df = pd.DataFrame({
+        'sid': ['112', '112', '113', '112', '114', '113', '112', '114'],
+        'r': ['1', '2', '1', '1', '3', '2', '1', '1'],
+        'id': ['AbC-1', 'abc-2', 'XYZ-3', 'xyz-4', 'AbC-5', 'def-6', 'DEF-7', 'abc-8'],
+        'p': [100.1, 250.0, np.nan, 100.1, 1600.0, 99.99, 300.5, 100.1],
+    })
+    for column in ('sid', 'r', 'id'):
+        df[column] = df[column].astype('category')
+    return df
+
+
+def baseline(df, filter_key):
+    # The original chained boolean filters
+    selected_section, selected_row, filter_id, min_price, max_price = filter_key
+    filtered_df = df.copy()
+    if selected_section != 'All':
+        filtered_df = filtered_df[filtered_df['sid'] == selected_section]
+    if selected_row != 'All':
+        filtered_df = filtered_df[filtered_df['r'] == selected_row]
+    if filter_id:
+        filtered_df = filtered_df[filtered_df['id'].astype(str).str.contains(filter_id, case=False, na=False, regex=False)]
+    return filtered_df[(filtered_df['p'] >= min_price) & (filtered_df['p'] <= max_price)]
+
+
+def positions(df, filter_key):
+    p_sorted, price_order = filtering.sort_by_price(df)
+    return filtering.filter_positions(df, filtering.build_indexes(df), p_sorted, price_order, filter_key)
+
+
+def assert_matches_baseline(df, filter_key):
+    np.testing.assert_array_equal(positions(df, filter_key), baseline(df, filter_key).index.to_numpy())
+
+
+def test_price_range_matches_baseline_and_drops_nan_prices():
+    df = make_listings()
+    assert_matches_baseline(df, ('All', 'All', '', 100.0, 1600.0))
+    assert_matches_baseline(df, ('All', 'All', '', *ALL_PRICES))
+    assert 2 not in positions(df, ('All', 'All', '', *ALL_PRICES))
+
+
+def test_boundary_price_with_equal_bounds():
+    df = make_listings()
+    assert_matches_baseline(df, ('All', 'All', '', 100.1, 100.1))
+    assert_matches_baseline(df, ('112', 'All', '', 100.1, 100.1))
+    np.testing.assert_array_equal(positions(df, ('All', 'All', '', 100.1, 100.1)), [0, 3, 7])
+
+
+def test_section_and_row_intersection():
+    df = make_listings()
+    assert_matches_baseline(df, ('112', '1', '', *ALL_PRICES))
+    assert_matches_baseline(df, ('114', '1', '', 100.0, 200.0))
+
+
+def test_unknown_section_selects_nothing():
+    df = make_listings()
+    assert len(positions(df, ('999', 'All', '', *ALL_PRICES))) == 0
+    assert_matches_baseline(df, ('999', '1', '', *ALL_PRICES))
+
+
+def test_id_substring_is_case_insensitive():
+    df = make_listings()
+    assert_matches_baseline(df, ('All', 'All', 'abc', *ALL_PRICES))
+    assert_matches_baseline(df, ('112', 'All', 'DeF', *ALL_PRICES))
+    np.testing.assert_array_equal(positions(df, ('All', 'All', 'ABC', *ALL_PRICES)), [0, 1, 4, 7])
+
+
+def test_no_filters_returns_the_frame_itself():
+    df = make_listings().dropna(subset=['p']).reset_index(drop=True)
+    p_sorted, _ = filtering.sort_by_price(df)
+    bounds = filtering.price_bounds(p_sorted)
+
+    def fail(filter_key):
+        raise AssertionError('positions should not be computed')
+
+    assert filtering.filtered_data(df, ('All', 'All', '', *bounds), bounds, fail) is df
+
+
+def test_nan_prices_disable_the_shortcut():
+    df = make_listings()
+    p_sorted, _ = filtering.sort_by_price(df)
+    bounds = filtering.price_bounds(p_sorted)
+    filter_key = ('All', 'All', '', *ALL_PRICES)
+
+    filtered_df = filtering.filtered_data(df, filter_key, bounds, lambda key: positions(df, key))
+    assert filtered_df is not df
+    assert filtered_df['p'].notna().all()
@@ -0,0 +1,46 @@
+"""Convert normalized_listings.json.gz to listings.parquet and normalized_listings.json.zst.
+
+Run once from the repository root:
+    python tools/convert.py
+"""
+import gzip
+
+import orjson
+import pandas as pd
+import zstandard as zstd
+
+SOURCE_PATH = 'normalized_listings.json.gz'
+TARGET_PATH = 'listings.parquet'
+ZSTD_TARGET_PATH = 'normalized_listings.json.zst'
+
+
+def convert(source_path=SOURCE_PATH, target_path=TARGET_PATH):
+    with gzip.open(source_path, 'rb') as file:
+        df = pd.DataFrame(orjson.loads(file.read()))
+
+    # Store timestamps as datetime64 so the app doesn't have to parse them
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    # Stored as categories, the Parquet file loads straight into category columns
+    for column in ('sid', 'r', 'id'):
+        df[column] = df[column].astype('category')
+
+    # Written in timestamp order so the app's sort in load_data has nothing to do
+    df.sort_values('timestamp', kind='mergesort', ignore_index=True, inplace=True)
+    df.to_parquet(target_path, engine='pyarrow', compression='zstd')
+    return df
+
+
+def recompress(source_path=SOURCE_PATH, target_path=ZSTD_TARGET_PATH, level=19):
+    # Same JSON payload, recompressed with zstd for faster decompression
+    with gzip.open(source_path, 'rb') as file:
+        payload = file.read()
+    with open(target_path, 'wb') as file:
+        file.write(zstd.ZstdCompressor(level=level).compress(payload))
+
+
+if __name__ == '__main__':
+    df = convert()
+    print(f"Wrote {len(df)} records to {TARGET_PATH}")
+    recompress()
+    print(f"Wrote {ZSTD_TARGET_PATH}")